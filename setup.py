@@ -1,46 +1,69 @@
+import ast
 import os
-import runpy
-import subprocess
-from tempfile import TemporaryDirectory
-from typing import List, Optional, Tuple, cast  # noqa: F401
+import re
+import sys
+from functools import lru_cache
+from typing import List, Optional, Tuple  # noqa: F401
 
 from setuptools import Command, setup
 
+PYINSTALLER_ENTRYPOINT = b"""#!/usr/bin/env python3
+
+from simple_term_menu import main
+
+
+if __name__ == "__main__":
+    main()
+"""
+
 
 class PyinstallerCommand(Command):  # type: ignore
     description = "create a self-contained executable with PyInstaller"
-    user_options = []  # type: List[Tuple[str, Optional[str], str]]
+    user_options = [
+        ("clean", None, "clean the PyInstaller cache and remove temporary files before building"),
+    ]  # type: List[Tuple[str, Optional[str], str]]
+    boolean_options = ["clean"]
 
     def initialize_options(self) -> None:
-        pass
+        self.clean = False
 
     def finalize_options(self) -> None:
         pass
 
     def run(self) -> None:
-        with TemporaryDirectory() as temp_dir:
-            subprocess.check_call(["python3", "-m", "venv", os.path.join(temp_dir, "env")])
+        # These modules are only needed for this command, so do not import them on every setup.py invocation
+        import subprocess
+        import venv
+        from tempfile import TemporaryDirectory
+
+        venv_dir = self._get_cached_venv_dir()
+        pip_path = os.path.join(venv_dir, "bin/pip")
+        # Keep downloaded and built wheels next to the cached environment, so rebuilding it does not fetch everything
+        # again
+        pip_env = dict(os.environ)
+        pip_env.setdefault("PIP_CACHE_DIR", os.path.join(self._get_cache_dir(), "pip"))
+        pip_env["PIP_DISABLE_PIP_VERSION_CHECK"] = "1"
+        if not os.path.isfile(os.path.join(venv_dir, "bin/pyinstaller")):
+            venv.EnvBuilder(clear=True, symlinks=True, with_pip=True).create(venv_dir)
+            # Resolve all build tools in one pip process instead of paying pip's startup costs several times
             subprocess.check_call(
-                [os.path.join(temp_dir, "env/bin/pip"), "install", "--upgrade", "pip", "setuptools", "wheel"]
+                [pip_path, "install", "--upgrade", "pip", "setuptools", "wheel", "pyinstaller"], env=pip_env
             )
-            subprocess.check_call([os.path.join(temp_dir, "env/bin/pip"), "install", "."])
-            subprocess.check_call([os.path.join(temp_dir, "env/bin/pip"), "install", "pyinstaller"])
-            with open(os.path.join(temp_dir, "entrypoint.py"), "w") as f:
-                f.write(
-                    """
-#!/usr/bin/env python3
-
-from simple_term_menu import main
-
-
-if __name__ == "__main__":
-    main()
-                    """.strip()
-                )
+        # The project itself changes between builds, so always reinstall it into the cached environment
+        subprocess.check_call([pip_path, "install", "--no-input", "--force-reinstall", "--no-deps", "."], env=pip_env)
+        with TemporaryDirectory() as temp_dir:
+            with open(os.path.join(temp_dir, "entrypoint.py"), "wb") as f:
+                f.write(PYINSTALLER_ENTRYPOINT)
             subprocess.check_call(
-                [
-                    os.path.join(temp_dir, "env/bin/pyinstaller"),
-                    "--clean",
+                [os.path.join(venv_dir, "bin/pyinstaller")]
+                # Reuse the PyInstaller cache of previous builds unless a clean build is requested explicitly
+                + (["--clean"] if self.clean else [])
+                + [
+                    "--noconfirm",
+                    "--log-level=WARN",
+                    # Only scratch files go to the temporary directory, the executable is written to a stable path
+                    "--specpath={}".format(temp_dir),
+                    "--distpath={}".format(os.path.abspath("dist")),
                     "--name=simple-term-menu",
                     "--onefile",
                     "--strip",
@@ -48,18 +71,47 @@ if __name__ == "__main__":
                 ]
             )
 
+    @classmethod
+    def _get_cached_venv_dir(cls) -> str:
+        import hashlib
+        from pathlib import Path
 
-def get_version_from_pyfile(version_file: str = "simple_term_menu.py") -> str:
-    file_globals = runpy.run_path(version_file)
-    return cast(str, file_globals["__version__"])
+        # Rebuild the environment when the Python interpreter or the build instructions in this file change
+        hash_obj = hashlib.sha256(sys.version.encode("utf-8"))
+        hash_obj.update(Path(__file__).read_bytes())
+        return os.path.join(cls._get_cache_dir(), "pyinstaller-venv-{}".format(hash_obj.hexdigest()[:16]))
 
+    @staticmethod
+    def _get_cache_dir() -> str:
+        return os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "simple-term-menu")
 
+
+@lru_cache(maxsize=None)
+def get_version_from_pyfile(version_file: str = "simple_term_menu.py") -> str:
+    # Scan for the version tuple instead of executing the whole module
+    version_info_regex = re.compile(r"^__version_info__\s*=\s*(\(.*\))\s*$")
+    with open(version_file, "r", encoding="utf-8") as f:
+        for line in f:
+            match_obj = version_info_regex.match(line)
+            if match_obj:
+                # Evaluate the tuple literal safely and build the version string like `simple_term_menu` does
+                return ".".join(map(str, ast.literal_eval(match_obj.group(1))))
+    raise RuntimeError('Could not find "__version_info__" in "{}".'.format(version_file))
+
+
+@lru_cache(maxsize=None)
 def get_long_description_from_readme(readme_filename: str = "README.md") -> Optional[str]:
-    long_description = None
-    if os.path.isfile(readme_filename):
-        with open(readme_filename, "r", encoding="utf-8") as readme_file:
-            long_description = readme_file.read()
-    return long_description
+    try:
+        readme_fd = os.open(readme_filename, os.O_RDONLY)
+    except FileNotFoundError:
+        return None
+    try:
+        # The file is consumed as a whole, so read it with one syscall sized by `fstat` instead of going through the
+        # buffered text layer
+        readme_bytes = os.read(readme_fd, os.fstat(readme_fd).st_size)
+    finally:
+        os.close(readme_fd)
+    return readme_bytes.decode("utf-8")
 
 
 version = get_version_from_pyfile()
@@ -1,28 +1,29 @@
 #!/usr/bin/env python3
 
-import argparse
-import copy
-import ctypes
+import array
+import codecs
+import collections
 import io
+import itertools
 import locale
 import os
-import platform
 import re
-import shlex
+import select
 import signal
 import string
-import subprocess
 import sys
+from functools import lru_cache
 from locale import getlocale
 from types import FrameType
 from typing import (
+    TYPE_CHECKING,
     Any,
     Callable,
     Dict,
+    FrozenSet,
     Iterable,
     Iterator,
     List,
-    Match,
     Optional,
     Pattern,
     Sequence,
@@ -36,8 +37,27 @@ from typing import (
 try:
     import termios
 except ImportError as e:
+    import platform
+
     raise NotImplementedError('"{}" is currently not supported.'.format(platform.system())) from e
 
+try:
+    import curses
+except ImportError:
+    # Python can be built without curses support, use the `tput` command in that case
+    curses = None  # type: ignore
+
+try:
+    # Optional C extension which determines the display width of text faster than calling the libc with `ctypes`
+    import cwcwidth
+except ImportError:
+    cwcwidth = None  # type: ignore[assignment, unused-ignore]
+
+if TYPE_CHECKING:
+    # Modules which are only needed by some code paths are imported there to keep the import of this module fast
+    import argparse
+    from subprocess import Popen  # noqa: F401
+
 
 __author__ = "Ingo Meyer"
 __email__ = "i.meyer@fz-juelich.de"
@@ -108,21 +128,37 @@ def get_locale() -> str:
 
 
 def wcswidth(text: str) -> int:
-    if not hasattr(wcswidth, "libc"):
+    # Printable ASCII characters always occupy one terminal column, so the (comparatively expensive) libc call can be
+    # skipped for most strings
+    if text.isprintable():
+        try:
+            text.encode("ascii")
+            return len(text)
+        except UnicodeEncodeError:
+            pass
+    if cwcwidth is not None:
+        return int(cwcwidth.wcswidth(text))
+    return _libc_wcswidth(text, get_locale())
+
+
+@lru_cache(maxsize=4096)
+def _libc_wcswidth(text: str, user_locale: str) -> int:
+    import ctypes
+
+    if not hasattr(_libc_wcswidth, "libc"):
         try:
-            if platform.system() == "Darwin":
-                wcswidth.libc = ctypes.cdll.LoadLibrary("libSystem.dylib")  # type: ignore
+            if sys.platform == "darwin":
+                _libc_wcswidth.libc = ctypes.cdll.LoadLibrary("libSystem.dylib")  # type: ignore
             else:
-                wcswidth.libc = ctypes.cdll.LoadLibrary("libc.so.6")  # type: ignore
+                _libc_wcswidth.libc = ctypes.cdll.LoadLibrary("libc.so.6")  # type: ignore
         except OSError:
-            wcswidth.libc = None  # type: ignore
-    if wcswidth.libc is not None:  # type: ignore
+            _libc_wcswidth.libc = None  # type: ignore
+    if _libc_wcswidth.libc is not None:  # type: ignore
         try:
-            user_locale = get_locale()
             # First replace any null characters with the unicode replacement character (U+FFFD) since they cannot be
             # passed in a `c_wchar_p`
             encoded_text = text.replace("\0", "\uFFFD").encode(encoding=user_locale, errors="replace")
-            return wcswidth.libc.wcswidth(  # type: ignore
+            return _libc_wcswidth.libc.wcswidth(  # type: ignore
                 ctypes.c_wchar_p(encoded_text.decode(encoding=user_locale)), len(encoded_text)
             )
         except AttributeError:
@@ -139,6 +175,53 @@ def static_variables(**variables: Any) -> Callable[[Callable[..., Any]], Callabl
     return decorator
 
 
+@static_variables(
+    # Regex taken from https://stackoverflow.com/a/14693789/5958465, extended by a group for styling codes (SGR) which
+    # only have numeric parameters (other sequences ending with `m` like `\x1B[>4;2m` or `\x1B[?4m` are no styling)
+    ansi_escape_regex=re.compile(r"\x1B(?:[@-Z\\-_]|(?P<sgr>\[[0-9;:]*m)|\[[0-?]*[ -/]*[@-~])"),
+)
+def strip_ansi_codes_except_styling(string: str) -> str:
+    # Every escape code starts with an escape character, so plain text can be returned unchanged
+    if "\x1B" not in string:
+        return string
+    # The regex marks styling codes with a named group, so no second regex match is needed
+    stripped_string = strip_ansi_codes_except_styling.ansi_escape_regex.sub(  # type: ignore
+        lambda match_obj: match_obj.group(0) if match_obj.group("sgr") is not None else "",
+        string,
+    )
+    return cast(str, stripped_string)
+
+
+@static_variables(
+    # Regular text, ansi escape codes or a single escape character which does not start a valid escape code
+    token_regex=re.compile(r"[^\x1B]+|\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])|\x1B"),
+)
+def limit_string_with_escape_codes(string: str, max_len: int) -> Tuple[str, int]:
+    if max_len <= 0:
+        return "", 0
+    if "\x1B" not in string:
+        string_len = wcswidth(string)
+        if string_len <= max_len:
+            return string, string_len
+    string_parts = []
+    string_len = 0
+    # Process the string in a single pass instead of repeatedly matching and slicing off its remainder
+    for token_match in limit_string_with_escape_codes.token_regex.finditer(string):  # type: ignore
+        token = token_match.group(0)
+        if token[0] == "\x1B":
+            # Adopt ansi escape codes (and stray escape characters) but do not count their length
+            string_parts.append(token)
+            continue
+        token_len = wcswidth(token)
+        if string_len + token_len > max_len:
+            string_parts.append(token[: max_len - string_len])
+            string_len = max_len
+            break
+        string_parts.append(token)
+        string_len += token_len
+    return "".join(string_parts), string_len
+
+
 class BoxDrawingCharacters:
     if getlocale()[1] == "UTF-8":
         # Unicode box characters
@@ -160,6 +243,8 @@ class BoxDrawingCharacters:
 
 class TerminalMenu:
     class Search:
+        _regex_metacharacters = frozenset(".^$*+?{}[]\\|()")
+
         def __init__(
             self,
             menu_entries: Iterable[str],
@@ -167,28 +252,71 @@ class TerminalMenu:
             case_senitive: bool = False,
             show_search_hint: bool = False,
         ):
-            self._menu_entries = menu_entries
+            self._menu_entries = list(menu_entries)
             self._case_sensitive = case_senitive
             self._show_search_hint = show_search_hint
-            self._matches = []  # type: List[Tuple[int, Match[str]]]
+            self._matches = []  # type: List[Tuple[int, Tuple[int, int]]]
+            self._matched_menu_indices = frozenset(i for i, _ in self._matches)
             self._search_regex = None  # type: Optional[Pattern[str]]
+            self._literal_search_text = None  # type: Optional[str]
+            self._matched_literal_search_text = None  # type: Optional[str]
+            self._lowercase_menu_entries = None  # type: Optional[List[Optional[str]]]
             self._change_callback = None  # type: Optional[Callable[[], None]]
             # Use the property setter since it has some more logic
             self.search_text = search_text
 
+        @staticmethod
+        def _is_ascii(text: str) -> bool:
+            try:
+                text.encode("ascii")
+            except UnicodeEncodeError:
+                return False
+            return True
+
         def _update_matches(self) -> None:
             if self._search_regex is None:
                 self._matches = []
             else:
+                if (
+                    self._literal_search_text is not None
+                    and self._matched_literal_search_text is not None
+                    and self._literal_search_text.startswith(self._matched_literal_search_text)
+                ):
+                    # An extended plain text query can only match a subset of the previously matched menu entries
+                    candidate_indices = [i for i, _ in self._matches]  # type: Iterable[int]
+                else:
+                    candidate_indices = range(len(self._menu_entries))
+                if self._literal_search_text is not None and not self._case_sensitive:
+                    # The menu entries do not change, so lowercase them only once for all case insensitive searches.
+                    # `str.lower` only folds case like `re.IGNORECASE` for ASCII text, so skip all other entries here
+                    if self._lowercase_menu_entries is None:
+                        self._lowercase_menu_entries = [
+                            menu_entry.lower() if self._is_ascii(menu_entry) else None
+                            for menu_entry in self._menu_entries
+                        ]
+                    searched_menu_entries = self._lowercase_menu_entries  # type: Sequence[Optional[str]]
+                else:
+                    searched_menu_entries = self._menu_entries
                 matches = []
-                for i, menu_entry in enumerate(self._menu_entries):
+                for i in candidate_indices:
+                    menu_entry = self._menu_entries[i]
+                    if self._literal_search_text is not None:
+                        # Plain text queries do not need the regex engine, `str.find` is much faster
+                        searched_menu_entry = searched_menu_entries[i]
+                        if searched_menu_entry is not None:
+                            match_start = searched_menu_entry.find(self._literal_search_text)
+                            if match_start >= 0:
+                                matches.append((i, (match_start, match_start + len(self._literal_search_text))))
+                            continue
                     match_obj = self._search_regex.search(menu_entry)
                     if match_obj:
-                        matches.append((i, match_obj))
+                        matches.append((i, match_obj.span()))
                 self._matches = matches
+            self._matched_menu_indices = frozenset(i for i, _ in self._matches)
+            self._matched_literal_search_text = self._literal_search_text
 
         @property
-        def matches(self) -> List[Tuple[int, Match[str]]]:
+        def matches(self) -> List[Tuple[int, Tuple[int, int]]]:
             return list(self._matches)
 
         @property
@@ -209,6 +337,14 @@ class TerminalMenu:
                     self._search_regex = re.compile(search_text, flags=re.IGNORECASE if not self._case_sensitive else 0)
                 except re.error:
                     search_text = search_text[:-1]
+            if (
+                search_text
+                and not any(character in self._regex_metacharacters for character in search_text)
+                and (self._case_sensitive or self._is_ascii(search_text))
+            ):
+                self._literal_search_text = search_text if self._case_sensitive else search_text.lower()
+            else:
+                self._literal_search_text = None
             self._update_matches()
             if self._change_callback:
                 self._change_callback()
@@ -232,7 +368,7 @@ class TerminalMenu:
             return self._search_text is not None
 
         def __contains__(self, menu_index: int) -> bool:
-            return any(i == menu_index for i, _ in self._matches)
+            return menu_index in self._matched_menu_indices
 
         def __len__(self) -> int:
             return wcswidth(self._search_text) if self._search_text is not None else 0
@@ -296,10 +432,11 @@ class TerminalMenu:
             self.update_view()
 
         def update_view(self) -> None:
+            # Store the indices as a compact C integer array instead of a tuple of int objects (matters for large menus)
             if self._search and self._search.search_text != "":
-                self._displayed_index_to_menu_index = tuple(i for i, match_obj in self._search.matches)
+                self._displayed_index_to_menu_index = array.array("i", (i for i, _ in self._search.matches))
             else:
-                self._displayed_index_to_menu_index = tuple(range(len(self._menu_entries)))
+                self._displayed_index_to_menu_index = array.array("i", range(len(self._menu_entries)))
             self._menu_index_to_displayed_index = {
                 menu_index: displayed_index
                 for displayed_index, menu_index in enumerate(self._displayed_index_to_menu_index)
@@ -386,20 +523,24 @@ class TerminalMenu:
             return self._viewport.num_displayed_menu_entries - 1
 
         @property
-        def displayed_selected_indices(self) -> List[int]:
-            return [
+        def displayed_selected_indices(self) -> Set[int]:
+            return {
                 self._menu_index_to_displayed_index[selected_index]
                 for selected_index in self._selection
                 if selected_index in self._menu_index_to_displayed_index
-            ]
+            }
 
         def __bool__(self) -> bool:
             return self._active_displayed_index is not None
 
         def __iter__(self) -> Iterator[Tuple[int, int, str]]:
-            for displayed_index, menu_index in enumerate(self._displayed_index_to_menu_index):
-                if self._viewport.lower_index <= displayed_index <= self._viewport.upper_index:
-                    yield (displayed_index, menu_index, self._menu_entries[menu_index])
+            # Only visit the entries inside the viewport instead of filtering all displayed entries
+            for displayed_index in range(
+                max(0, self._viewport.lower_index),
+                min(self._viewport.upper_index + 1, len(self._displayed_index_to_menu_index)),
+            ):
+                menu_index = self._displayed_index_to_menu_index[displayed_index]
+                yield (displayed_index, menu_index, self._menu_entries[menu_index])
 
     class Viewport:
         def __init__(
@@ -586,7 +727,38 @@ class TerminalMenu:
     }
     _codenames = tuple(_codename_to_capname.keys())
     _codename_to_terminal_code = None  # type: Optional[Dict[str, str]]
+    # `cursor_down` is not included since `cud1` is usually a newline which (in contrast to `cud`) scrolls the terminal
+    _codename_to_parameterized_capname = {
+        "cursor_up": "cuu",
+        "delete_line": "dl",
+    }
+    _repeated_terminal_codes = {}  # type: Dict[Tuple[str, int], str]
+    _numeric_capnames = ("colors", "cols", "lines")
+    _terminfo_padding_regex = re.compile(rb"\$<[0-9.]+[*/]*>")
+    _menu_entry_separator_regex = re.compile(r"([^\\])\|")
+    _escaped_menu_entry_separator_regex = re.compile(r"\\\|")
+    _menu_entry_regex = re.compile(r"^(?:\[(\S)\]\s*)?([^\x1F]+)(?:\x1F([^\x1F]*))?")
+    _stty_name_to_keycode_regex = re.compile(r"^\s*(\S+)\s*=\s*\^(\S+)\s*$")
+    _terminfo_database_is_loaded = None  # type: Optional[bool]
+    _terminal_size = None  # type: Optional[Tuple[int, int]]
+    _preview_cache_size = 128
+    # Time in seconds to collect further resize events before the menu is repainted
+    _resize_repaint_delay = 0.05
     _terminal_code_to_codename = None  # type: Optional[Dict[str, str]]
+    _escape_sequence_key_codes = ()  # type: Tuple[str, ...]
+    # Two or more directly following Select Graphic Rendition (SGR) codes, like `\x1B[1m\x1B[31m`
+    _consecutive_sgr_codes_regex = re.compile(r"(?:\x1B\[[0-9;]*m){2,}")
+    _sgr_parameters_regex = re.compile(r"\x1B\[([0-9;]*)m")
+    # Synchronized output (DEC private mode 2026): Terminals which support it show the whole frame at once instead of
+    # rendering intermediate states, other terminals ignore unknown private modes
+    _begin_synchronized_update = "\x1B[?2026h"
+    _end_synchronized_update = "\x1B[?2026l"
+    # Control sequences (CSI), single shift sequences (SS3), alt modified keys, a single escape or any other character
+    _key_code_regex = re.compile(r"\x1B(?:\[[0-?]*[ -/]*[@-~]|O.|.)?|.", re.DOTALL)
+    # Beginning of an escape sequence whose remaining characters have not been read yet
+    _incomplete_escape_sequence_regex = re.compile(r"\x1B(?:\[[0-?]*[ -/]*|O)?\Z")
+    # Time in seconds to wait for the remainder of an escape sequence (like the `ESCDELAY` of ncurses)
+    _escape_sequence_timeout = 0.05
 
     def __init__(
         self,
@@ -644,9 +816,6 @@ class TerminalMenu:
         def extract_shortcuts_menu_entries_and_preview_arguments(
             entries: Iterable[str],
         ) -> Tuple[List[str], List[Optional[str]], List[Optional[str]], List[int]]:
-            separator_pattern = re.compile(r"([^\\])\|")
-            escaped_separator_pattern = re.compile(r"\\\|")
-            menu_entry_pattern = re.compile(r"^(?:\[(\S)\]\s*)?([^\x1F]+)(?:\x1F([^\x1F]*))?")
             shortcut_keys = []  # type: List[Optional[str]]
             menu_entries = []  # type: List[str]
             preview_arguments = []  # type: List[Optional[str]]
@@ -658,9 +827,16 @@ class TerminalMenu:
                     menu_entries.append("")
                     preview_arguments.append(None)
                     skip_indices.append(idx)
+                elif "|" not in entry and "\x1F" not in entry and entry[:1] not in ("", "["):
+                    # Most entries are plain text without a shortcut key or preview argument, skip the regex parsing
+                    shortcut_keys.append(None)
+                    menu_entries.append(entry)
+                    preview_arguments.append(None)
                 else:
-                    unit_separated_entry = escaped_separator_pattern.sub("|", separator_pattern.sub("\\1\x1F", entry))
-                    match_obj = menu_entry_pattern.match(unit_separated_entry)
+                    unit_separated_entry = self._escaped_menu_entry_separator_regex.sub(
+                        "|", self._menu_entry_separator_regex.sub("\\1\x1F", entry)
+                    )
+                    match_obj = self._menu_entry_regex.match(unit_separated_entry)
                     # this is none in case the entry was an emtpy string which
                     # will be interpreted as a separator
                     assert match_obj is not None
@@ -748,6 +924,12 @@ class TerminalMenu:
         )
         self._multi_select_keys = tuple(multi_select_keys) if multi_select_keys is not None else ()
         self._multi_select_select_on_accept = multi_select_select_on_accept
+        # The cursors and the shortcut column do not change, so their widths are only measured once
+        self._menu_cursor_width = wcswidth(self._menu_cursor)
+        self._multi_select_cursor_width = wcswidth(self._multi_select_cursor) if self._multi_select else 0
+        self._shortcut_string_len = 4 if self._shortcuts_defined else 0
+        # Menu entry widths are measured on first display; this avoids measuring all entries of large menus up front
+        self._menu_entry_widths = {}  # type: Dict[int, int]
         if preselected_entries and not self._multi_select:
             raise InvalidParameterCombinationError(
                 "Multi-select mode must be enabled when preselected entries are given."
@@ -800,9 +982,24 @@ class TerminalMenu:
         self._chosen_accept_key = None  # type: Optional[str]
         self._chosen_menu_index = None  # type: Optional[int]
         self._chosen_menu_indices = None  # type: Optional[Tuple[int, ...]]
-        self._paint_before_next_read = False
         self._previous_displayed_menu_height = None  # type: Optional[int]
-        self._reading_next_key = False
+        self._previous_menu_lines = []  # type: List[str]
+        self._rendered_blank_line = ""
+        self._rendered_lines_num_cols = None  # type: Optional[int]
+        self._rendered_menu_entries = {}  # type: Dict[int, str]
+        self._rendered_preview_borders = ("", "")
+        self._rendered_title = ""
+        self._style_to_terminal_codes = {}  # type: Dict[Tuple[Optional[Tuple[str, ...]], bool], str]
+        self._pending_key_codes = []  # type: List[str]
+        self._key_decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        self._preview_cache = collections.OrderedDict()  # type: collections.OrderedDict[str, str]
+        self._preview_command_parts = None  # type: Optional[List[Tuple[str, bool]]]
+        self._preview_process = None  # type: Optional[Popen[bytes]]
+        self._preview_process_argument = None  # type: Optional[str]
+        self._preview_process_output = []  # type: List[bytes]
+        self._previous_preview_string = None  # type: Optional[str]
+        self._resize_pending = False
+        self._resize_wakeup_fds = None  # type: Optional[Tuple[int, int]]
         self._search = self.Search(
             self._menu_entries,
             case_senitive=self._search_case_sensitive,
@@ -857,15 +1054,15 @@ class TerminalMenu:
         if len(key) == 1:
             # One letter keys represent themselves
             return key
-        alt_modified_regex = re.compile(r"[Aa]lt-(\S)")
-        ctrl_modified_regex = re.compile(r"[Cc]trl-(\S)")
-        match_obj = alt_modified_regex.match(key)
-        if match_obj:
-            return "\033" + match_obj.group(1)
-        match_obj = ctrl_modified_regex.match(key)
-        if match_obj:
+        # Plain prefix checks are sufficient to parse `alt-<key>` and `ctrl-<key>`, no regex is needed
+        modifier, _, modified_key = key.partition("-")
+        if not modified_key or modified_key[0].isspace():
+            raise ValueError('Cannot interpret the given key "{}".'.format(key))
+        if modifier in ("alt", "Alt"):
+            return "\033" + modified_key[0]
+        if modifier in ("ctrl", "Ctrl"):
             # Ctrl + key is interpreted by terminals as the ascii code of that key minus 64
-            ctrl_code_ascii = ord(match_obj.group(1).upper()) - 64
+            ctrl_code_ascii = ord(modified_key[0].upper()) - 64
             if ctrl_code_ascii < 0:
                 # Interpret negative ascii codes as unsigned 7-Bit integers
                 ctrl_code_ascii = ctrl_code_ascii & 0x80 - 1
@@ -874,12 +1071,13 @@ class TerminalMenu:
 
     @classmethod
     def _init_backspace_control_character(self) -> None:
+        import subprocess
+
         try:
             with open("/dev/tty", "r") as tty:
                 stty_output = subprocess.check_output(["stty", "-a"], universal_newlines=True, stdin=tty)
-            name_to_keycode_regex = re.compile(r"^\s*(\S+)\s*=\s*\^(\S+)\s*$")
             for field in stty_output.split(";"):
-                match_obj = name_to_keycode_regex.match(field)
+                match_obj = self._stty_name_to_keycode_regex.match(field)
                 if not match_obj:
                     continue
                 name, ctrl_code = match_obj.group(1), match_obj.group(2)
@@ -912,9 +1110,65 @@ class TerminalMenu:
             for codename in cls._codenames
         }
         cls._codename_to_terminal_code.update(cls._name_to_control_character)
+
+    @classmethod
+    def _init_terminal_code_to_codename(cls) -> None:
+        # The reverse mapping is only needed for decoding key presses, so it is built on the first key read
+        if cls._terminal_code_to_codename is not None:
+            return
+        assert cls._codename_to_terminal_code is not None
         cls._terminal_code_to_codename = {
             terminal_code: codename for codename, terminal_code in cls._codename_to_terminal_code.items()
         }
+        # Longest codes first, so a code is not cut off at a shorter code which is a prefix of it
+        cls._escape_sequence_key_codes = tuple(
+            sorted(
+                (code for code in cls._terminal_code_to_codename if len(code) > 1 and code.startswith("\x1B")),
+                key=len,
+                reverse=True,
+            )
+        )
+
+    @classmethod
+    def _split_key_codes(cls, text: str) -> List[str]:
+        # Without an escape character, every character is a key on its own (the most common case)
+        if "\x1B" not in text:
+            return list(text)
+        key_codes = []
+        position = 0
+        while position < len(text):
+            # All escape sequence key codes start with an escape character, so other characters need no comparison
+            if text[position] != "\x1B":
+                key_code = text[position]
+            else:
+                for escape_sequence_key_code in cls._escape_sequence_key_codes:
+                    if text.startswith(escape_sequence_key_code, position):
+                        key_code = escape_sequence_key_code
+                        break
+                else:
+                    key_code_match = cls._key_code_regex.match(text, position)
+                    assert key_code_match is not None
+                    key_code = key_code_match.group(0)
+            key_codes.append(key_code)
+            position += len(key_code)
+        return key_codes
+
+    @classmethod
+    def _load_terminfo_database(cls) -> bool:
+        if cls._terminfo_database_is_loaded is None:
+            cls._terminfo_database_is_loaded = False
+            if curses is not None:
+                try:
+                    # `setupterm` needs a terminal file descriptor, but only uses it to determine the window size
+                    tty_fd = os.open("/dev/tty", os.O_RDWR)
+                    try:
+                        curses.setupterm(fd=tty_fd)
+                        cls._terminfo_database_is_loaded = True
+                    finally:
+                        os.close(tty_fd)
+                except (OSError, curses.error):
+                    pass
+        return cls._terminfo_database_is_loaded
 
     @classmethod
     def _query_terminfo_database(cls, codename: str) -> str:
@@ -922,6 +1176,20 @@ class TerminalMenu:
             capname = cls._codename_to_capname[codename]
         else:
             capname = codename
+        if cls._load_terminfo_database():
+            # Read the capability in-process instead of forking a `tput` subprocess for each query
+            capname, *parameters = capname.split()
+            if capname in cls._numeric_capnames:
+                return str(curses.tigetnum(capname))
+            terminal_code = curses.tigetstr(capname)
+            if terminal_code is None:
+                return ""
+            if parameters:
+                terminal_code = curses.tparm(terminal_code, *(int(parameter) for parameter in parameters))
+            # Remove padding information (like `$<5>`) which is only interpreted by `tputs`
+            return cls._terminfo_padding_regex.sub(b"", terminal_code).decode("utf-8", errors="replace")
+        import subprocess
+
         try:
             return subprocess.check_output(["tput"] + capname.split(), universal_newlines=True)
         except subprocess.CalledProcessError as e:
@@ -930,17 +1198,78 @@ class TerminalMenu:
                 return ""
             raise e
 
+    @classmethod
+    def _get_repeated_terminal_code(cls, codename: str, count: int) -> str:
+        # pylint: disable=unsubscriptable-object
+        assert cls._codename_to_terminal_code is not None
+        if count < 2 or codename not in cls._codename_to_parameterized_capname or not cls._load_terminfo_database():
+            return count * cls._codename_to_terminal_code[codename]
+        if (codename, count) not in cls._repeated_terminal_codes:
+            # Move the cursor or delete lines with one parameterized escape sequence (like `\x1B[5A`) instead of
+            # repeating the single line code `count` times
+            terminal_code = cls._query_terminfo_database(
+                "{} {}".format(cls._codename_to_parameterized_capname[codename], count)
+            )
+            cls._repeated_terminal_codes[(codename, count)] = (
+                terminal_code if terminal_code else count * cls._codename_to_terminal_code[codename]
+            )
+        return cls._repeated_terminal_codes[(codename, count)]
+
+    @classmethod
+    def _query_terminal_size(cls) -> Tuple[int, int]:
+        # Use the same lookup order as `tput`: environment variables, window size of the terminal, terminfo database
+        num_lines, num_cols = 0, 0
+        for stream in (sys.__stdout__, sys.__stderr__, sys.__stdin__):
+            if stream is None:
+                continue
+            try:
+                num_cols, num_lines = os.get_terminal_size(stream.fileno())
+                break
+            except (OSError, ValueError):
+                pass
+        else:
+            # All standard streams are redirected (for example in `$(simple-term-menu ...)` with piped input), but the
+            # menu is drawn to the controlling terminal anyway, so ask it for its size
+            try:
+                tty_fd = os.open("/dev/tty", os.O_RDONLY)
+                try:
+                    num_cols, num_lines = os.get_terminal_size(tty_fd)
+                finally:
+                    os.close(tty_fd)
+            except OSError:
+                pass
+        terminal_size = []
+        for env_variable, window_size, capname in (("LINES", num_lines, "lines"), ("COLUMNS", num_cols, "cols")):
+            try:
+                size = int(os.environ[env_variable])
+            except (KeyError, ValueError):
+                size = 0
+            if size <= 0:
+                size = window_size if window_size > 0 else int(cls._query_terminfo_database(capname))
+            terminal_size.append(size)
+        return terminal_size[0], terminal_size[1]
+
+    @classmethod
+    def _invalidate_terminal_size(cls) -> None:
+        cls._terminal_size = None
+
+    @classmethod
+    def _cached_terminal_size(cls) -> Tuple[int, int]:
+        # The size is queried many times per frame, but only changes between frames (signaled by `SIGWINCH`)
+        if cls._terminal_size is None:
+            cls._terminal_size = cls._query_terminal_size()
+        return cls._terminal_size
+
     @classmethod
     def _num_lines(self) -> int:
-        return int(self._query_terminfo_database("lines"))
+        return self._cached_terminal_size()[0]
 
     @classmethod
     def _num_cols(self) -> int:
-        return int(self._query_terminfo_database("cols"))
+        return self._cached_terminal_size()[1]
 
     def _check_for_valid_styles(self) -> None:
-        invalid_styles = []
-        for style_tuple in (
+        style_tuples = (
             self._menu_cursor_style,
             self._menu_highlight_style,
             self._search_highlight_style,
@@ -949,10 +1278,13 @@ class TerminalMenu:
             self._status_bar_style,
             self._multi_select_cursor_brackets_style,
             self._multi_select_cursor_style,
-        ):
-            for style in style_tuple:
-                if style not in self._codename_to_capname:
-                    invalid_styles.append(style)
+        )
+        # Usually, all styles are valid which can be checked with a single set operation
+        if self._codename_to_capname.keys() >= set(itertools.chain.from_iterable(style_tuples)):
+            return
+        invalid_styles = [
+            style for style_tuple in style_tuples for style in style_tuple if style not in self._codename_to_capname
+        ]
         if invalid_styles:
             if len(invalid_styles) == 1:
                 raise InvalidStyleError('The style "{}" does not exist.'.format(invalid_styles[0]))
@@ -964,6 +1296,11 @@ class TerminalMenu:
         assert self._codename_to_terminal_code is not None
         self._tty_in = open("/dev/tty", "r", encoding=self._user_locale)
         self._tty_out = open("/dev/tty", "w", encoding=self._user_locale, errors="replace")
+        # Nothing of the menu is shown in the terminal yet
+        self._previous_menu_lines = []
+        # Discard keys which were read together with the key that closed the previous menu
+        self._pending_key_codes = []
+        self._key_decoder.reset()
         self._old_term = termios.tcgetattr(self._tty_in.fileno())
         self._new_term = termios.tcgetattr(self._tty_in.fileno())
         # set the terminal to: no line-buffering, no echo and no <CR> to <NL> translation (so <enter> sends <CR> instead
@@ -1045,102 +1382,214 @@ class TerminalMenu:
         ) -> None:
             # pylint: disable=unsubscriptable-object
             assert self._codename_to_terminal_code is not None
-            assert self._tty_out is not None
             if file is None:
-                file = self._tty_out
-            if reset or style_iterable is None:
-                file.write(self._codename_to_terminal_code["reset_attributes"])
-            if style_iterable is not None:
-                for style in style_iterable:
-                    file.write(self._codename_to_terminal_code[style])
+                file = output
+            # The styles do not change while the menu is shown, so join their escape codes only once
+            style_key = (tuple(style_iterable) if style_iterable is not None else None, reset)
+            if style_key not in self._style_to_terminal_codes:
+                terminal_codes = []
+                if reset or style_iterable is None:
+                    terminal_codes.append(self._codename_to_terminal_code["reset_attributes"])
+                if style_key[0] is not None:
+                    terminal_codes.extend(self._codename_to_terminal_code[style] for style in style_key[0])
+                # Merge following SGR codes into one code (`\x1B[1m\x1B[31m` -> `\x1B[1;31m`) to send fewer bytes
+                self._style_to_terminal_codes[style_key] = self._consecutive_sgr_codes_regex.sub(
+                    lambda match_obj: "\x1B[{}m".format(
+                        ";".join(
+                            parameters if parameters else "0"
+                            for parameters in self._sgr_parameters_regex.findall(match_obj.group(0))
+                        )
+                    ),
+                    "".join(terminal_codes),
+                )
+            file.write(self._style_to_terminal_codes[style_key])
 
         def print_menu_entries() -> int:
             # pylint: disable=unsubscriptable-object
             assert self._codename_to_terminal_code is not None
-            assert self._tty_out is not None
-            all_cursors_width = wcswidth(self._menu_cursor) + (
-                wcswidth(self._multi_select_cursor) if self._multi_select else 0
-            )
+
+            def prepare_multi_select_cursors() -> Tuple[str, str]:
+                bracket_characters = "([{<)]}>"
+                bracket_style_escape_codes_io = io.StringIO()
+                multi_select_cursor_style_escape_codes_io = io.StringIO()
+                reset_codes_io = io.StringIO()
+                apply_style(self._multi_select_cursor_brackets_style, file=bracket_style_escape_codes_io)
+                apply_style(self._multi_select_cursor_style, file=multi_select_cursor_style_escape_codes_io)
+                apply_style(file=reset_codes_io)
+                bracket_style_escape_codes = bracket_style_escape_codes_io.getvalue()
+                multi_select_cursor_style_escape_codes = multi_select_cursor_style_escape_codes_io.getvalue()
+                reset_codes = reset_codes_io.getvalue()
+
+                cursor_with_brackets_only = re.sub(
+                    r"[^{}]".format(re.escape(bracket_characters)), " ", self._multi_select_cursor
+                )
+                cursor_with_brackets_only_styled = re.sub(
+                    r"[{}]+".format(re.escape(bracket_characters)),
+                    lambda match_obj: bracket_style_escape_codes + match_obj.group(0) + reset_codes,
+                    cursor_with_brackets_only,
+                )
+                cursor_styled = re.sub(
+                    r"[{brackets}]+|[^{brackets}\s]+".format(brackets=re.escape(bracket_characters)),
+                    lambda match_obj: (
+                        bracket_style_escape_codes
+                        if match_obj.group(0)[0] in bracket_characters
+                        else multi_select_cursor_style_escape_codes
+                    )
+                    + match_obj.group(0)
+                    + reset_codes,
+                    self._multi_select_cursor,
+                )
+                return cursor_styled, cursor_with_brackets_only_styled
+
+            def render_menu_entry(displayed_index: int, menu_index: int, menu_entry: str) -> str:
+                rendered_entry = io.StringIO()
+                current_shortcut_key = self._shortcut_keys[menu_index]
+                if self._shortcuts_defined:
+                    if current_shortcut_key is not None:
+                        apply_style(self._shortcut_brackets_highlight_style, file=rendered_entry)
+                        rendered_entry.write("[")
+                        apply_style(self._shortcut_key_highlight_style, file=rendered_entry)
+                        rendered_entry.write(current_shortcut_key)
+                        apply_style(self._shortcut_brackets_highlight_style, file=rendered_entry)
+                        rendered_entry.write("]")
+                        apply_style(file=rendered_entry)
+                    else:
+                        rendered_entry.write(3 * " ")
+                    rendered_entry.write(" ")
+                if menu_index == active_menu_index:
+                    apply_style(self._menu_highlight_style, file=rendered_entry)
+                if is_searching:
+                    match_start, match_end = search_matches[displayed_index][1]
+                    rendered_entry.write(menu_entry[: min(match_start, max_menu_entry_width)])
+                    apply_style(self._search_highlight_style, file=rendered_entry)
+                    rendered_entry.write(menu_entry[match_start : min(match_end, max_menu_entry_width)])
+                    apply_style(file=rendered_entry)
+                    if menu_index == active_menu_index:
+                        apply_style(self._menu_highlight_style, file=rendered_entry)
+                    rendered_entry.write(menu_entry[match_end:max_menu_entry_width])
+                else:
+                    rendered_entry.write(menu_entry[:max_menu_entry_width])
+                if menu_index == active_menu_index:
+                    apply_style(file=rendered_entry)
+                if menu_index not in self._menu_entry_widths:
+                    self._menu_entry_widths[menu_index] = wcswidth(menu_entry)
+                rendered_entry.write(
+                    self._rendered_blank_line[: max(max_menu_entry_width - self._menu_entry_widths[menu_index], 0)]
+                )
+                return rendered_entry.getvalue()
+
+            cursor_width = self._menu_cursor_width
+            multi_select_cursor_width = self._multi_select_cursor_width
+            all_cursors_width = cursor_width + multi_select_cursor_width
             current_menu_block_displayed_height = 0  # sum all written lines
             num_cols = self._num_cols()
+            # Rendered titles and menu entries only need to be recreated if the terminal width changes
+            if num_cols != self._rendered_lines_num_cols:
+                self._rendered_title = "\n".join(
+                    (title_line[:num_cols] + (num_cols - wcswidth(title_line)) * " ")
+                    for title_line in self._title_lines
+                )
+                self._rendered_menu_entries = {}
+                # Padding is sliced from one blank line instead of multiplying spaces for every menu line
+                self._rendered_blank_line = num_cols * " "
+                self._rendered_preview_borders = (
+                    (
+                        BoxDrawingCharacters.upper_left
+                        + (2 * BoxDrawingCharacters.horizontal + " " + self._preview_title)[: num_cols - 3]
+                        + " "
+                        + (num_cols - wcswidth(self._preview_title) - 6) * BoxDrawingCharacters.horizontal
+                        + BoxDrawingCharacters.upper_right
+                    )[:num_cols],
+                    (
+                        BoxDrawingCharacters.lower_left
+                        + (num_cols - 2) * BoxDrawingCharacters.horizontal
+                        + BoxDrawingCharacters.lower_right
+                    )[:num_cols],
+                )
+                self._rendered_lines_num_cols = num_cols
             if self._title_lines:
-                self._tty_out.write(
-                    len(self._title_lines) * self._codename_to_terminal_code["cursor_up"]
+                output.write(
+                    self._get_repeated_terminal_code("cursor_up", len(self._title_lines))
                     + "\r"
-                    + "\n".join(
-                        (title_line[:num_cols] + (num_cols - wcswidth(title_line)) * " ")
-                        for title_line in self._title_lines
-                    )
+                    + self._rendered_title
                     + "\n"
                 )
-            shortcut_string_len = 4 if self._shortcuts_defined else 0
+            if self._multi_select:
+                checked_multi_select_cursor, unchecked_multi_select_cursor = prepare_multi_select_cursors()
+                displayed_selected_indices = self._view.displayed_selected_indices
+            shortcut_string_len = self._shortcut_string_len
+            max_menu_entry_width = num_cols - all_cursors_width - shortcut_string_len
+            # `matches` returns a copy, so fetch it only once per frame
+            search_matches = self._search.matches
+            is_searching = bool(self._search) and self._search.search_text != ""
+            active_menu_index = self._view.active_menu_index
+            # Bind attributes which are read for every menu line to local variables
+            active_displayed_index = self._view.active_displayed_index
+            multi_select = self._multi_select
+            skip_indices = self._skip_indices
+            rendered_menu_entries = self._rendered_menu_entries
+            styled_menu_cursor_io = io.StringIO()
+            apply_style(self._menu_cursor_style, file=styled_menu_cursor_io)
+            styled_menu_cursor_io.write(self._menu_cursor)
+            apply_style(file=styled_menu_cursor_io)
+            styled_menu_cursor = styled_menu_cursor_io.getvalue()
+            empty_menu_cursor = cursor_width * " "
+            empty_multi_select_cursor = multi_select_cursor_width * " "
+            # Render every menu line completely (cursor column, multi-select column and menu entry) to be able to
+            # compare it with the line that is already shown in the terminal
+            menu_lines = []  # type: List[str]
             displayed_index = -1
             for displayed_index, menu_index, menu_entry in self._view:
-                current_shortcut_key = self._shortcut_keys[menu_index]
-                self._tty_out.write(all_cursors_width * self._codename_to_terminal_code["cursor_right"])
-                if self._shortcuts_defined:
-                    if current_shortcut_key is not None:
-                        apply_style(self._shortcut_brackets_highlight_style)
-                        self._tty_out.write("[")
-                        apply_style(self._shortcut_key_highlight_style)
-                        self._tty_out.write(current_shortcut_key)
-                        apply_style(self._shortcut_brackets_highlight_style)
-                        self._tty_out.write("]")
-                        apply_style()
+                menu_line = io.StringIO()
+                if displayed_index == active_displayed_index:
+                    menu_line.write(styled_menu_cursor)
+                else:
+                    menu_line.write(empty_menu_cursor)
+                if multi_select:
+                    if menu_index in skip_indices:
+                        menu_line.write(empty_multi_select_cursor)
+                    elif displayed_index in displayed_selected_indices:
+                        menu_line.write(checked_multi_select_cursor)
                     else:
-                        self._tty_out.write(3 * " ")
-                    self._tty_out.write(" ")
-                if menu_index == self._view.active_menu_index:
-                    apply_style(self._menu_highlight_style)
-                if self._search and self._search.search_text != "":
-                    match_obj = self._search.matches[displayed_index][1]
-                    self._tty_out.write(
-                        menu_entry[: min(match_obj.start(), num_cols - all_cursors_width - shortcut_string_len)]
-                    )
-                    apply_style(self._search_highlight_style)
-                    self._tty_out.write(
-                        menu_entry[
-                            match_obj.start() : min(match_obj.end(), num_cols - all_cursors_width - shortcut_string_len)
-                        ]
-                    )
-                    apply_style()
-                    if menu_index == self._view.active_menu_index:
-                        apply_style(self._menu_highlight_style)
-                    self._tty_out.write(
-                        menu_entry[match_obj.end() : num_cols - all_cursors_width - shortcut_string_len]
-                    )
+                        menu_line.write(unchecked_multi_select_cursor)
+                # Entries without cursor highlight or search match only depend on the terminal width, so render them
+                # once and reuse them in the following frames
+                if menu_index != active_menu_index and not is_searching:
+                    if menu_index not in rendered_menu_entries:
+                        rendered_menu_entries[menu_index] = render_menu_entry(displayed_index, menu_index, menu_entry)
+                    menu_line.write(rendered_menu_entries[menu_index])
                 else:
-                    self._tty_out.write(menu_entry[: num_cols - all_cursors_width - shortcut_string_len])
-                if menu_index == self._view.active_menu_index:
-                    apply_style()
-                self._tty_out.write((num_cols - wcswidth(menu_entry) - all_cursors_width - shortcut_string_len) * " ")
-                if displayed_index < self._viewport.upper_index:
-                    self._tty_out.write("\n")
+                    menu_line.write(render_menu_entry(displayed_index, menu_index, menu_entry))
+                menu_lines.append(menu_line.getvalue())
             empty_menu_lines = self._viewport.upper_index - displayed_index
-            self._tty_out.write(
-                max(0, empty_menu_lines - 1) * (num_cols * " " + "\n") + min(1, empty_menu_lines) * (num_cols * " ")
-            )
-            self._tty_out.write("\r" + (self._viewport.size - 1) * self._codename_to_terminal_code["cursor_up"])
+            menu_lines.extend(max(0, empty_menu_lines) * [self._rendered_blank_line])
+            # Only rewrite lines which differ from the previously painted frame, otherwise just move to the next line
+            for i, rendered_line in enumerate(menu_lines):
+                if i > 0:
+                    output.write("\n")
+                if i >= len(self._previous_menu_lines) or self._previous_menu_lines[i] != rendered_line:
+                    output.write(rendered_line)
+            self._previous_menu_lines = menu_lines
+            output.write("\r" + self._get_repeated_terminal_code("cursor_up", self._viewport.size - 1))
             current_menu_block_displayed_height += self._viewport.size - 1  # sum all written lines
             return current_menu_block_displayed_height
 
         def print_search_line(current_menu_height: int) -> int:
             # pylint: disable=unsubscriptable-object
             assert self._codename_to_terminal_code is not None
-            assert self._tty_out is not None
             current_menu_block_displayed_height = 0
             num_cols = self._num_cols()
             if self._search or self._show_search_hint:
-                self._tty_out.write((current_menu_height + 1) * self._codename_to_terminal_code["cursor_down"])
+                output.write((current_menu_height + 1) * self._codename_to_terminal_code["cursor_down"])
             if self._search:
                 assert self._search.search_text is not None
-                self._tty_out.write(
+                output.write(
                     (
                         (self._search_key if self._search_key is not None else DEFAULT_SEARCH_KEY)
                         + self._search.search_text
                     )[:num_cols]
                 )
-                self._tty_out.write((num_cols - len(self._search) - 1) * " ")
+                output.write((num_cols - len(self._search) - 1) * " ")
             elif self._show_search_hint:
                 if self._show_search_hint_text is not None:
                     search_hint = self._show_search_hint_text.format(key=self._search_key)[:num_cols]
@@ -1148,23 +1597,22 @@ class TerminalMenu:
                     search_hint = '(Press "{key}" to search)'.format(key=self._search_key)[:num_cols]
                 else:
                     search_hint = "(Press any letter key to search)"[:num_cols]
-                self._tty_out.write(search_hint)
-                self._tty_out.write((num_cols - wcswidth(search_hint)) * " ")
+                output.write(search_hint)
+                output.write((num_cols - wcswidth(search_hint)) * " ")
             if self._search or self._show_search_hint:
-                self._tty_out.write("\r" + (current_menu_height + 1) * self._codename_to_terminal_code["cursor_up"])
+                output.write("\r" + self._get_repeated_terminal_code("cursor_up", current_menu_height + 1))
                 current_menu_block_displayed_height = 1
             return current_menu_block_displayed_height
 
         def print_status_bar(current_menu_height: int, status_bar_lines: Tuple[str, ...]) -> int:
             # pylint: disable=unsubscriptable-object
             assert self._codename_to_terminal_code is not None
-            assert self._tty_out is not None
             current_menu_block_displayed_height = 0  # sum all written lines
             num_cols = self._num_cols()
             if status_bar_lines:
-                self._tty_out.write((current_menu_height + 1) * self._codename_to_terminal_code["cursor_down"])
+                output.write((current_menu_height + 1) * self._codename_to_terminal_code["cursor_down"])
                 apply_style(self._status_bar_style)
-                self._tty_out.write(
+                output.write(
                     "\r"
                     + "\n".join(
                         (status_bar_line[:num_cols] + (num_cols - wcswidth(status_bar_line)) * " ")
@@ -1173,16 +1621,13 @@ class TerminalMenu:
                     + "\r"
                 )
                 apply_style()
-                self._tty_out.write(
-                    (current_menu_height + len(status_bar_lines)) * self._codename_to_terminal_code["cursor_up"]
-                )
+                output.write(self._get_repeated_terminal_code("cursor_up", current_menu_height + len(status_bar_lines)))
                 current_menu_block_displayed_height += len(status_bar_lines)
             return current_menu_block_displayed_height
 
         def print_preview(current_menu_height: int, preview_max_num_lines: int) -> int:
             # pylint: disable=unsubscriptable-object
             assert self._codename_to_terminal_code is not None
-            assert self._tty_out is not None
             if self._preview_command is None or preview_max_num_lines < 3:
                 return 0
 
@@ -1198,79 +1643,19 @@ class TerminalMenu:
                 if preview_argument == "":
                     return None
                 if isinstance(self._preview_command, str):
-                    try:
-                        preview_process = subprocess.Popen(
-                            [cmd_part.format(preview_argument) for cmd_part in shlex.split(self._preview_command)],
-                            stdout=subprocess.PIPE,
-                            stderr=subprocess.PIPE,
-                        )
-                        assert preview_process.stdout is not None
-                        preview_string = (
-                            io.TextIOWrapper(preview_process.stdout, encoding=self._user_locale, errors="replace")
-                            .read()
-                            .strip()
-                        )
-                    except subprocess.CalledProcessError as e:
-                        raise PreviewCommandFailedError(
-                            e.stderr.decode(encoding=self._user_locale, errors="replace").strip()
-                        ) from e
-                else:
-                    preview_string = self._preview_command(preview_argument) if preview_argument is not None else ""
-                return preview_string
-
-            @static_variables(
-                # Regex taken from https://stackoverflow.com/a/14693789/5958465
-                ansi_escape_regex=re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])"),
-                # Modified version of https://stackoverflow.com/a/2188410/5958465
-                ansi_sgr_regex=re.compile(r"\x1B\[[;\d]*m"),
-            )
-            def strip_ansi_codes_except_styling(string: str) -> str:
-                stripped_string = strip_ansi_codes_except_styling.ansi_escape_regex.sub(  # type: ignore
-                    lambda match_obj: (
-                        match_obj.group(0)
-                        if strip_ansi_codes_except_styling.ansi_sgr_regex.match(match_obj.group(0))  # type: ignore
-                        else ""
-                    ),
-                    string,
-                )
-                return cast(str, stripped_string)
-
-            @static_variables(
-                regular_text_regex=re.compile(r"([^\x1B]+)(.*)"),
-                ansi_escape_regex=re.compile(r"(\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~]))(.*)"),
-            )
-            def limit_string_with_escape_codes(string: str, max_len: int) -> Tuple[str, int]:
-                if max_len <= 0:
-                    return "", 0
-                string_parts = []
-                string_len = 0
-                while string:
-                    regular_text_match = limit_string_with_escape_codes.regular_text_regex.match(string)  # type: ignore
-                    if regular_text_match is not None:
-                        regular_text = regular_text_match.group(1)
-                        regular_text_len = wcswidth(regular_text)
-                        if string_len + regular_text_len > max_len:
-                            string_parts.append(regular_text[: max_len - string_len])
-                            string_len = max_len
-                            break
-                        string_parts.append(regular_text)
-                        string_len += regular_text_len
-                        string = regular_text_match.group(2)
-                    else:
-                        ansi_escape_match = limit_string_with_escape_codes.ansi_escape_regex.match(  # type: ignore
-                            string
-                        )
-                        if ansi_escape_match is not None:
-                            # Adopt the ansi escape code but do not count its length
-                            ansi_escape_code_text = ansi_escape_match.group(1)
-                            string_parts.append(ansi_escape_code_text)
-                            string = ansi_escape_match.group(2)
-                        else:
-                            # It looks like an escape code (starts with escape), but it is something else
-                            # -> skip the escape character and continue the loop
-                            string_parts.append("\x1B")
-                            string = string[1:]
-                return "".join(string_parts), string_len
+                    assert preview_argument is not None
+                    # Revisited menu entries (and repaints of the same entry) do not need to run the preview command
+                    # again. Preview functions are called on every repaint since they may return dynamic content.
+                    if preview_argument in self._preview_cache:
+                        self._preview_cache.move_to_end(preview_argument)
+                        self._previous_preview_string = self._preview_cache[preview_argument]
+                        return self._previous_preview_string
+                    if self._preview_process_argument != preview_argument:
+                        self._start_preview_process(preview_argument)
+                    # The preview command runs in the background (see `_read_next_key`), keep showing the previous
+                    # preview until its output is complete to keep the menu responsive
+                    return self._previous_preview_string
+                return self._preview_command(preview_argument) if preview_argument is not None else ""
 
             num_cols = self._num_cols()
             try:
@@ -1279,158 +1664,74 @@ class TerminalMenu:
                     preview_string = strip_ansi_codes_except_styling(preview_string)
             except PreviewCommandFailedError as e:
                 preview_string = "The preview command failed with error message:\n\n" + str(e)
-            self._tty_out.write(current_menu_height * self._codename_to_terminal_code["cursor_down"])
+            output.write(current_menu_height * self._codename_to_terminal_code["cursor_down"])
             if preview_string is not None:
-                self._tty_out.write(self._codename_to_terminal_code["cursor_down"] + "\r")
+                output.write(self._codename_to_terminal_code["cursor_down"] + "\r")
+                # The borders only depend on the terminal width and are rendered with the menu entries
                 if self._preview_border:
-                    self._tty_out.write(
-                        (
-                            BoxDrawingCharacters.upper_left
-                            + (2 * BoxDrawingCharacters.horizontal + " " + self._preview_title)[: num_cols - 3]
-                            + " "
-                            + (num_cols - wcswidth(self._preview_title) - 6) * BoxDrawingCharacters.horizontal
-                            + BoxDrawingCharacters.upper_right
-                        )[:num_cols]
-                        + "\n"
-                    )
-                # `finditer` can be used as a generator version of `str.join`
-                for i, line in enumerate(
-                    match.group(0) for match in re.finditer(r"^.*$", preview_string, re.MULTILINE)
-                ):
-                    if i >= preview_max_num_lines - (2 if self._preview_border else 0):
+                    output.write(self._rendered_preview_borders[0] + "\n")
+                max_num_lines = preview_max_num_lines - (2 if self._preview_border else 0)
+                # The line decorations are the same for all preview lines
+                if self._preview_border:
+                    left_border, right_border = BoxDrawingCharacters.vertical + " ", BoxDrawingCharacters.vertical
+                else:
+                    left_border, right_border = "", ""
+                max_line_len = num_cols - (3 if self._preview_border else 0)
+                reset_attributes = self._codename_to_terminal_code["reset_attributes"]
+                # Limit the number of splits, so long outputs are not split completely
+                for i, line in enumerate(preview_string.split("\n", max(max_num_lines, 0))):
+                    if i >= max_num_lines:
                         preview_num_lines = preview_max_num_lines
                         break
-                    limited_line, limited_line_len = limit_string_with_escape_codes(
-                        line, num_cols - (3 if self._preview_border else 0)
-                    )
-                    self._tty_out.write(
-                        (
-                            ((BoxDrawingCharacters.vertical + " ") if self._preview_border else "")
-                            + limited_line
-                            + self._codename_to_terminal_code["reset_attributes"]
-                            + max(num_cols - limited_line_len - (3 if self._preview_border else 0), 0) * " "
-                            + (BoxDrawingCharacters.vertical if self._preview_border else "")
-                        )
+                    limited_line, limited_line_len = limit_string_with_escape_codes(line, max_line_len)
+                    output.write(
+                        left_border
+                        + limited_line
+                        + reset_attributes
+                        + self._rendered_blank_line[: max(max_line_len - limited_line_len, 0)]
+                        + right_border
                     )
                 else:
                     preview_num_lines = i + (3 if self._preview_border else 1)
                 if self._preview_border:
-                    self._tty_out.write(
-                        "\n"
-                        + (
-                            BoxDrawingCharacters.lower_left
-                            + (num_cols - 2) * BoxDrawingCharacters.horizontal
-                            + BoxDrawingCharacters.lower_right
-                        )[:num_cols]
-                    )
-                self._tty_out.write("\r")
+                    output.write("\n" + self._rendered_preview_borders[1])
+                output.write("\r")
             else:
                 preview_num_lines = 0
-            self._tty_out.write(
-                (current_menu_height + preview_num_lines) * self._codename_to_terminal_code["cursor_up"]
-            )
+            output.write(self._get_repeated_terminal_code("cursor_up", current_menu_height + preview_num_lines))
             return preview_num_lines
 
         def delete_old_menu_lines(displayed_menu_height: int) -> None:
             # pylint: disable=unsubscriptable-object
             assert self._codename_to_terminal_code is not None
-            assert self._tty_out is not None
             if (
                 self._previous_displayed_menu_height is not None
                 and self._previous_displayed_menu_height > displayed_menu_height
             ):
-                self._tty_out.write((displayed_menu_height + 1) * self._codename_to_terminal_code["cursor_down"])
-                self._tty_out.write(
-                    (self._previous_displayed_menu_height - displayed_menu_height)
-                    * self._codename_to_terminal_code["delete_line"]
-                )
-                self._tty_out.write((displayed_menu_height + 1) * self._codename_to_terminal_code["cursor_up"])
-
-        def position_cursor() -> None:
-            # pylint: disable=unsubscriptable-object
-            assert self._codename_to_terminal_code is not None
-            assert self._tty_out is not None
-            if self._view.active_displayed_index is None:
-                return
-
-            cursor_width = wcswidth(self._menu_cursor)
-            for displayed_index in range(self._viewport.lower_index, self._viewport.upper_index + 1):
-                if displayed_index == self._view.active_displayed_index:
-                    apply_style(self._menu_cursor_style)
-                    self._tty_out.write(self._menu_cursor)
-                    apply_style()
-                else:
-                    self._tty_out.write(cursor_width * " ")
-                self._tty_out.write("\r")
-                if displayed_index < self._viewport.upper_index:
-                    self._tty_out.write(self._codename_to_terminal_code["cursor_down"])
-            self._tty_out.write((self._viewport.size - 1) * self._codename_to_terminal_code["cursor_up"])
-
-        def print_multi_select_column() -> None:
-            # pylint: disable=unsubscriptable-object
-            assert self._codename_to_terminal_code is not None
-            assert self._tty_out is not None
-            if not self._multi_select:
-                return
-
-            def prepare_multi_select_cursors() -> Tuple[str, str]:
-                bracket_characters = "([{<)]}>"
-                bracket_style_escape_codes_io = io.StringIO()
-                multi_select_cursor_style_escape_codes_io = io.StringIO()
-                reset_codes_io = io.StringIO()
-                apply_style(self._multi_select_cursor_brackets_style, file=bracket_style_escape_codes_io)
-                apply_style(self._multi_select_cursor_style, file=multi_select_cursor_style_escape_codes_io)
-                apply_style(file=reset_codes_io)
-                bracket_style_escape_codes = bracket_style_escape_codes_io.getvalue()
-                multi_select_cursor_style_escape_codes = multi_select_cursor_style_escape_codes_io.getvalue()
-                reset_codes = reset_codes_io.getvalue()
-
-                cursor_with_brackets_only = re.sub(
-                    r"[^{}]".format(re.escape(bracket_characters)), " ", self._multi_select_cursor
-                )
-                cursor_with_brackets_only_styled = re.sub(
-                    r"[{}]+".format(re.escape(bracket_characters)),
-                    lambda match_obj: bracket_style_escape_codes + match_obj.group(0) + reset_codes,
-                    cursor_with_brackets_only,
-                )
-                cursor_styled = re.sub(
-                    r"[{brackets}]+|[^{brackets}\s]+".format(brackets=re.escape(bracket_characters)),
-                    lambda match_obj: (
-                        bracket_style_escape_codes
-                        if match_obj.group(0)[0] in bracket_characters
-                        else multi_select_cursor_style_escape_codes
+                output.write((displayed_menu_height + 1) * self._codename_to_terminal_code["cursor_down"])
+                output.write(
+                    self._get_repeated_terminal_code(
+                        "delete_line", self._previous_displayed_menu_height - displayed_menu_height
                     )
-                    + match_obj.group(0)
-                    + reset_codes,
-                    self._multi_select_cursor,
                 )
-                return cursor_styled, cursor_with_brackets_only_styled
-
-            if not self._view:
-                return
-            checked_multi_select_cursor, unchecked_multi_select_cursor = prepare_multi_select_cursors()
-            cursor_width = wcswidth(self._menu_cursor)
-            displayed_selected_indices = self._view.displayed_selected_indices
-            displayed_index = 0
-            for displayed_index, _, _ in self._view:
-                self._tty_out.write("\r" + cursor_width * self._codename_to_terminal_code["cursor_right"])
-                if displayed_index in self._skip_indices:
-                    self._tty_out.write("")
-                elif displayed_index in displayed_selected_indices:
-                    self._tty_out.write(checked_multi_select_cursor)
-                else:
-                    self._tty_out.write(unchecked_multi_select_cursor)
-                if displayed_index < self._viewport.upper_index:
-                    self._tty_out.write(self._codename_to_terminal_code["cursor_down"])
-            self._tty_out.write("\r")
-            self._tty_out.write(
-                (displayed_index + (1 if displayed_index < self._viewport.upper_index else 0))
-                * self._codename_to_terminal_code["cursor_up"]
-            )
+                output.write(self._get_repeated_terminal_code("cursor_up", displayed_menu_height + 1))
+                # Moving the cursor below the last terminal line scrolls the terminal contents, so do not rely on the
+                # previously painted menu lines in the next frame
+                self._previous_menu_lines = []
 
         # pylint: disable=unsubscriptable-object
         assert self._codename_to_terminal_code is not None
         assert self._tty_out is not None
+        # Collect the whole frame and send it to the terminal at once instead of issuing many small writes
+        output = io.StringIO()
+        # Any repaint shows the current terminal size, so a pending resize does not need an extra repaint. The signal
+        # handler only sets the flag, consume it here since a resize during painting must not be lost.
+        resize_pending = self._resize_pending
+        self._resize_pending = False
+        self._invalidate_terminal_size()
+        if resize_pending:
+            # The terminal may have rewrapped or cleared its contents, so repaint all menu lines
+            self._previous_menu_lines = []
         displayed_menu_height = 0  # sum all written lines
         status_bar_lines = get_status_bar_lines()
         self._viewport.status_bar_lines_count = len(status_bar_lines)
@@ -1447,11 +1748,81 @@ class TerminalMenu:
         if self._status_bar_below_preview:
             displayed_menu_height += print_status_bar(displayed_menu_height, status_bar_lines)
         delete_old_menu_lines(displayed_menu_height)
-        position_cursor()
-        if self._multi_select:
-            print_multi_select_column()
         self._previous_displayed_menu_height = displayed_menu_height
+        self._write_frame(output.getvalue())
+
+    def _write_frame(self, frame: str) -> None:
+        assert self._tty_out is not None
+        # Send previously buffered output first to keep the order of all terminal writes
         self._tty_out.flush()
+        # Encode the frame once and pass it to the terminal directly instead of going through the text layer of
+        # `_tty_out`; `os.write` may write only a part of the buffer, so loop until everything is written
+        encoded_frame = memoryview(
+            (self._begin_synchronized_update + frame + self._end_synchronized_update).encode(
+                self._user_locale, errors="replace"
+            )
+        )
+        tty_out_fd = self._tty_out.fileno()
+        while encoded_frame:
+            encoded_frame = encoded_frame[os.write(tty_out_fd, encoded_frame) :]
+
+    def _cache_preview_string(self, preview_argument: str, preview_string: str) -> None:
+        self._preview_cache[preview_argument] = preview_string
+        if len(self._preview_cache) > self._preview_cache_size:
+            self._preview_cache.popitem(last=False)
+        self._previous_preview_string = preview_string
+
+    def _start_preview_process(self, preview_argument: str) -> None:
+        import subprocess
+
+        assert isinstance(self._preview_command, str)
+        if self._preview_command_parts is None:
+            import shlex
+
+            # The command does not change, so split it only once; only parts with braces need to be formatted
+            self._preview_command_parts = [
+                (cmd_part, "{" in cmd_part or "}" in cmd_part) for cmd_part in shlex.split(self._preview_command)
+            ]
+        # A preview of another menu entry is not needed anymore
+        self._stop_preview_process()
+        self._preview_process = subprocess.Popen(
+            [
+                cmd_part.format(preview_argument) if needs_formatting else cmd_part
+                for cmd_part, needs_formatting in self._preview_command_parts
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self._preview_process_argument = preview_argument
+        self._preview_process_output = []
+
+    def _stop_preview_process(self) -> None:
+        if self._preview_process is not None:
+            self._preview_process.kill()
+            self._finish_preview_process()
+
+    def _read_preview_process_output(self) -> bool:
+        assert self._preview_process is not None and self._preview_process.stdout is not None
+        output_chunk = os.read(self._preview_process.stdout.fileno(), 65536)
+        if output_chunk:
+            self._preview_process_output.append(output_chunk)
+            return False
+        # End of file: the preview is complete
+        assert self._preview_process_argument is not None
+        self._cache_preview_string(
+            self._preview_process_argument,
+            b"".join(self._preview_process_output).decode(encoding=self._user_locale, errors="replace").strip(),
+        )
+        self._finish_preview_process()
+        return True
+
+    def _finish_preview_process(self) -> None:
+        assert self._preview_process is not None and self._preview_process.stdout is not None
+        self._preview_process.stdout.close()
+        self._preview_process.wait()
+        self._preview_process = None
+        self._preview_process_argument = None
+        self._preview_process_output = []
 
     def _clear_menu(self) -> None:
         # pylint: disable=unsubscriptable-object
@@ -1460,10 +1831,10 @@ class TerminalMenu:
         assert self._tty_out is not None
         if self._clear_menu_on_exit:
             if self._title_lines:
-                self._tty_out.write(len(self._title_lines) * self._codename_to_terminal_code["cursor_up"])
-                self._tty_out.write(len(self._title_lines) * self._codename_to_terminal_code["delete_line"])
+                self._tty_out.write(self._get_repeated_terminal_code("cursor_up", len(self._title_lines)))
+                self._tty_out.write(self._get_repeated_terminal_code("delete_line", len(self._title_lines)))
             self._tty_out.write(
-                (self._previous_displayed_menu_height + 1) * self._codename_to_terminal_code["delete_line"]
+                self._get_repeated_terminal_code("delete_line", self._previous_displayed_menu_height + 1)
             )
         else:
             self._tty_out.write(
@@ -1473,16 +1844,45 @@ class TerminalMenu:
 
     def _read_next_key(self, ignore_case: bool = True) -> str:
         # pylint: disable=unsubscriptable-object,unsupported-membership-test
+        self._init_terminal_code_to_codename()
         assert self._terminal_code_to_codename is not None
         assert self._tty_in is not None
-        # Needed for asynchronous handling of terminal resize events
-        self._reading_next_key = True
-        if self._paint_before_next_read:
-            self._paint_menu()
-            self._paint_before_next_read = False
-        # blocks until any amount of bytes is available
-        code = os.read(self._tty_in.fileno(), 80).decode("utf-8", errors="ignore")
-        self._reading_next_key = False
+        if not self._pending_key_codes:
+            tty_in_fd = self._tty_in.fileno()
+            # Wait for key presses and handle terminal resizes and the output of a running preview command meanwhile
+            while True:
+                wait_fds = [tty_in_fd]
+                if self._resize_wakeup_fds is not None:
+                    wait_fds.append(self._resize_wakeup_fds[0])
+                if self._preview_process is not None:
+                    assert self._preview_process.stdout is not None
+                    wait_fds.append(self._preview_process.stdout.fileno())
+                ready_fds = select.select(wait_fds, [], [])[0]
+                if tty_in_fd in ready_fds:
+                    break
+                if self._resize_wakeup_fds is not None and self._resize_wakeup_fds[0] in ready_fds:
+                    # A resize by dragging the terminal window sends a burst of signals, so wait a moment (but not
+                    # longer than the next key press) to repaint only once for all of them
+                    select.select([tty_in_fd], [], [], self._resize_repaint_delay)
+                    self._drain_resize_wakeup_fd()
+                    if self._resize_pending:
+                        self._paint_menu()
+                elif self._preview_process is not None and self._read_preview_process_output():
+                    self._paint_menu()
+            # A multibyte character can be split between two reads, the incremental decoder keeps incomplete
+            # sequences until the next read instead of dropping them
+            text = self._key_decoder.decode(os.read(tty_in_fd, 80))
+            # Escape sequences can be split between reads (for example on slow ssh connections), wait briefly for the
+            # rest of the sequence to not interpret its start as an escape key press
+            while (
+                self._incomplete_escape_sequence_regex.search(text)
+                and select.select([tty_in_fd], [], [], self._escape_sequence_timeout)[0]
+            ):
+                text += self._key_decoder.decode(os.read(tty_in_fd, 80))
+            # One read can return several keys (fast typing, key repeat, pasted text), so split them to handle every
+            # key on its own (and to repaint only once after all of them)
+            self._pending_key_codes = self._split_key_codes(text) or [""]
+        code = self._pending_key_codes.pop(0)
         if code in self._terminal_code_to_codename:
             return self._terminal_code_to_codename[code]
         elif ignore_case:
@@ -1490,25 +1890,72 @@ class TerminalMenu:
         else:
             return code
 
+    def _drain_resize_wakeup_fd(self) -> None:
+        assert self._resize_wakeup_fds is not None
+        try:
+            while os.read(self._resize_wakeup_fds[0], 512):
+                pass
+        except BlockingIOError:
+            pass
+
     def show(self) -> Optional[Union[int, Tuple[int, ...]]]:
-        def init_signal_handling() -> None:
+        def init_signal_handling() -> int:
             # `SIGWINCH` is send on terminal resizes
             def handle_sigwinch(signum: int, frame: Optional[FrameType]) -> None:
                 # pylint: disable=unused-argument
-                if self._reading_next_key:
-                    self._paint_menu()
-                else:
-                    self._paint_before_next_read = True
-
+                # Only request a full repaint, the signal can arrive while the menu is painted. Do not paint in the
+                # signal handler itself, the wakeup fd interrupts `_read_next_key` which repaints only once for a burst
+                # of resize events.
+                self._resize_pending = True
+
+            self._resize_wakeup_fds = os.pipe()
+            for fd in self._resize_wakeup_fds:
+                os.set_blocking(fd, False)
+            previous_wakeup_fd = signal.set_wakeup_fd(self._resize_wakeup_fds[1])
             signal.signal(signal.SIGWINCH, handle_sigwinch)
+            return previous_wakeup_fd
 
-        def reset_signal_handling() -> None:
+        def reset_signal_handling(previous_wakeup_fd: int) -> None:
             signal.signal(signal.SIGWINCH, signal.SIG_DFL)
+            if self._resize_wakeup_fds is not None:
+                signal.set_wakeup_fd(previous_wakeup_fd)
+                for fd in self._resize_wakeup_fds:
+                    os.close(fd)
+                self._resize_wakeup_fds = None
 
-        def remove_letter_keys(menu_action_to_keys: Dict[str, Set[Optional[str]]]) -> None:
+        def without_letter_keys(menu_action_to_keys: Dict[str, Set[Optional[str]]]) -> Dict[str, Set[Optional[str]]]:
             letter_keys = frozenset(string.ascii_lowercase) | frozenset(" ")
-            for keys in menu_action_to_keys.values():
-                keys -= letter_keys
+            return {action: keys - letter_keys for action, keys in menu_action_to_keys.items()}
+
+        def get_paint_state() -> Tuple[Optional[int], int, Optional[str], FrozenSet[int]]:
+            # Everything a key press can change on the screen
+            return (
+                self._view.active_displayed_index,
+                self._viewport.lower_index,
+                self._search.search_text,
+                frozenset(self._selection),
+            )
+
+        def get_key_to_menu_action(menu_action_to_keys: Dict[str, Set[Optional[str]]]) -> Dict[Optional[str], str]:
+            # Map every key to the action of the first matching branch in the key handling below, so the action of a
+            # key press can be found with a single lookup
+            key_to_menu_action = {}  # type: Dict[Optional[str], str]
+            for menu_action in (
+                "menu_up",
+                "menu_down",
+                "menu_page_up",
+                "menu_page_down",
+                "menu_start",
+                "menu_end",
+                "multi_select",
+                "accept",
+                "quit",
+            ):
+                if menu_action == "multi_select" and not self._multi_select:
+                    continue
+                for key in menu_action_to_keys[menu_action]:
+                    key_to_menu_action.setdefault(key, menu_action)
+            return key_to_menu_action
 
         # pylint: disable=unsubscriptable-object
         assert self._codename_to_terminal_code is not None
@@ -1518,13 +1965,18 @@ class TerminalMenu:
         self._chosen_accept_key = None
         self._chosen_menu_indices = None
         self._chosen_menu_index = None
+        # Show up-to-date previews each time the menu is opened
+        self._preview_cache.clear()
+        self._previous_preview_string = None
+        assert self._tty_in is not None
         assert self._tty_out is not None
         if self._title_lines:
             # `print_menu` expects the cursor on the first menu item -> reserve one line for the title
             self._tty_out.write(len(self._title_lines) * self._codename_to_terminal_code["cursor_down"])
         menu_was_interrupted = False
+        previous_wakeup_fd = -1
         try:
-            init_signal_handling()
+            previous_wakeup_fd = init_signal_handling()
             menu_action_to_keys = {
                 "menu_up": set(("up", "ctrl-k", "ctrl-p", "k")),
                 "menu_down": set(("down", "ctrl-j", "ctrl-n", "j")),
@@ -1538,14 +1990,29 @@ class TerminalMenu:
                 "search_start": set((self._search_key,)),
                 "backspace": set(("backspace",)),
             }  # type: Dict[str, Set[Optional[str]]]
+            # Both key maps are fixed while the menu is shown, so build them once instead of copying per key press
+            menu_action_to_keys_without_letter_keys = without_letter_keys(menu_action_to_keys)
+            key_to_menu_action = get_key_to_menu_action(menu_action_to_keys)
+            key_to_menu_action_without_letter_keys = get_key_to_menu_action(menu_action_to_keys_without_letter_keys)
+            painted_state = None  # type: Optional[Tuple[Optional[int], int, Optional[str], FrozenSet[int]]]
             while True:
-                self._paint_menu()
-                current_menu_action_to_keys = copy.deepcopy(menu_action_to_keys)
+                # Do not repaint while more keys are already waiting to be read (for example on key repeat), so a burst
+                # of key presses is handled with a single repaint. Keys which do not change anything (like `up` on the
+                # first entry without cursor cycling) do not need a repaint at all.
+                if not self._pending_key_codes and not select.select([self._tty_in], [], [], 0)[0]:
+                    if get_paint_state() != painted_state or self._resize_pending:
+                        self._paint_menu()
+                        # Painting can scroll the viewport, so take the state afterwards
+                        painted_state = get_paint_state()
                 next_key = self._read_next_key(ignore_case=False)
                 if self._search or self._search_key is None:
-                    remove_letter_keys(current_menu_action_to_keys)
+                    current_menu_action_to_keys = menu_action_to_keys_without_letter_keys
+                    current_key_to_menu_action = key_to_menu_action_without_letter_keys
                 else:
+                    current_menu_action_to_keys = menu_action_to_keys
+                    current_key_to_menu_action = key_to_menu_action
                     next_key = next_key.lower()
+                menu_action = current_key_to_menu_action.get(next_key)
                 if self._search_key is not None and not self._search and next_key in self._shortcut_keys:
                     shortcut_menu_index = self._shortcut_keys.index(next_key)
                     if self._exit_on_shortcut:
@@ -1556,22 +2023,22 @@ class TerminalMenu:
                             self._selection.toggle(shortcut_menu_index)
                         else:
                             self._view.active_menu_index = shortcut_menu_index
-                elif next_key in current_menu_action_to_keys["menu_up"]:
+                elif menu_action == "menu_up":
                     self._view.decrement_active_index()
-                elif next_key in current_menu_action_to_keys["menu_down"]:
+                elif menu_action == "menu_down":
                     self._view.increment_active_index()
-                elif next_key in current_menu_action_to_keys["menu_page_up"]:
+                elif menu_action == "menu_page_up":
                     self._view.page_up()
-                elif next_key in current_menu_action_to_keys["menu_page_down"]:
+                elif menu_action == "menu_page_down":
                     self._view.page_down()
-                elif next_key in current_menu_action_to_keys["menu_start"]:
+                elif menu_action == "menu_start":
                     self._view.active_displayed_index = 0
-                elif next_key in current_menu_action_to_keys["menu_end"]:
+                elif menu_action == "menu_end":
                     self._view.active_displayed_index = self._view.max_displayed_index
-                elif self._multi_select and next_key in current_menu_action_to_keys["multi_select"]:
+                elif menu_action == "multi_select":
                     if self._view.active_menu_index is not None:
                         self._selection.toggle(self._view.active_menu_index)
-                elif next_key in current_menu_action_to_keys["accept"]:
+                elif menu_action == "accept":
                     if self._view.active_menu_index is not None:
                         if (
                             self._multi_select_select_on_accept
@@ -1581,7 +2048,7 @@ class TerminalMenu:
                             self._selection.add(self._view.active_menu_index)
                     self._chosen_accept_key = next_key
                     break
-                elif next_key in current_menu_action_to_keys["quit"]:
+                elif menu_action == "quit":
                     if not self._search:
                         menu_was_interrupted = True
                         break
@@ -1612,7 +2079,8 @@ class TerminalMenu:
                 raise e
             menu_was_interrupted = True
         finally:
-            reset_signal_handling()
+            reset_signal_handling(previous_wakeup_fd)
+            self._stop_preview_process()
             self._clear_menu()
             self._reset_term()
         if not menu_was_interrupted:
@@ -1649,15 +2117,10 @@ class TerminalMenu:
         return self._chosen_menu_indices
 
 
-class AttributeDict(dict):  # type: ignore
-    def __getattr__(self, attr: str) -> Any:
-        return self[attr]
+@lru_cache(maxsize=1)
+def get_argumentparser() -> "argparse.ArgumentParser":
+    import argparse
 
-    def __setattr__(self, attr: str, value: Any) -> None:
-        self[attr] = value
-
-
-def get_argumentparser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         formatter_class=argparse.RawDescriptionHelpFormatter,
         description="""
@@ -1934,49 +2397,29 @@ def get_argumentparser() -> argparse.ArgumentParser:
     return parser
 
 
-def parse_arguments() -> AttributeDict:
+_COMMA_SEPARATED_ARGUMENT_NAMES = (
+    "cursor_style",
+    "highlight_style",
+    "search_highlight_style",
+    "shortcut_key_highlight_style",
+    "shortcut_brackets_highlight_style",
+    "status_bar_style",
+    "multi_select_cursor_brackets_style",
+    "multi_select_cursor_style",
+    "multi_select_keys",
+)
+
+
+def parse_arguments() -> "argparse.Namespace":
     parser = get_argumentparser()
-    args = AttributeDict({key: value for key, value in vars(parser.parse_args()).items()})
+    args = parser.parse_args()
     if not args.print_version and not args.entries:
         raise NoMenuEntriesError("No menu entries given!")
     if args.skip_empty_entries:
         args.entries = [entry if entry != "None" else None for entry in args.entries]
-    if args.cursor_style != "":
-        args.cursor_style = tuple(args.cursor_style.split(","))
-    else:
-        args.cursor_style = None
-    if args.highlight_style != "":
-        args.highlight_style = tuple(args.highlight_style.split(","))
-    else:
-        args.highlight_style = None
-    if args.search_highlight_style != "":
-        args.search_highlight_style = tuple(args.search_highlight_style.split(","))
-    else:
-        args.search_highlight_style = None
-    if args.shortcut_key_highlight_style != "":
-        args.shortcut_key_highlight_style = tuple(args.shortcut_key_highlight_style.split(","))
-    else:
-        args.shortcut_key_highlight_style = None
-    if args.shortcut_brackets_highlight_style != "":
-        args.shortcut_brackets_highlight_style = tuple(args.shortcut_brackets_highlight_style.split(","))
-    else:
-        args.shortcut_brackets_highlight_style = None
-    if args.status_bar_style != "":
-        args.status_bar_style = tuple(args.status_bar_style.split(","))
-    else:
-        args.status_bar_style = None
-    if args.multi_select_cursor_brackets_style != "":
-        args.multi_select_cursor_brackets_style = tuple(args.multi_select_cursor_brackets_style.split(","))
-    else:
-        args.multi_select_cursor_brackets_style = None
-    if args.multi_select_cursor_style != "":
-        args.multi_select_cursor_style = tuple(args.multi_select_cursor_style.split(","))
-    else:
-        args.multi_select_cursor_style = None
-    if args.multi_select_keys != "":
-        args.multi_select_keys = tuple(args.multi_select_keys.split(","))
-    else:
-        args.multi_select_keys = None
+    for argument_name in _COMMA_SEPARATED_ARGUMENT_NAMES:
+        argument_value = getattr(args, argument_name)
+        setattr(args, argument_name, tuple(argument_value.split(",")) if argument_value != "" else None)
     if args.search_key.lower() == "none":
         args.search_key = None
     if args.show_shortcut_hints_in_status_bar:
@@ -1984,7 +2427,7 @@ def parse_arguments() -> AttributeDict:
     if args.multi_select:
         args.stdout = True
     if args.preselected_entries is not None:
-        args.preselected = list(args.preselected_entries.split(","))
+        args.preselected = args.preselected_entries.split(",")
     elif args.preselected_indices is not None:
         args.preselected = list(map(int, args.preselected_indices.split(",")))
     else:
@@ -1993,7 +2436,17 @@ def parse_arguments() -> AttributeDict:
 
 
 def main() -> None:
+    def print_version() -> None:
+        print("{}, version {}".format(os.path.basename(sys.argv[0]), __version__))
+
+    # A plain version query does not need the argument parser
+    if sys.argv[1:] in (["-V"], ["--version"]):
+        print_version()
+        sys.exit(0)
     try:
+        if len(sys.argv) < 2:
+            # Skip building the argument parser if there is nothing to parse
+            raise NoMenuEntriesError("No menu entries given!")
         args = parse_arguments()
     except SystemExit:
         sys.exit(0)  # Error code 0 is the error case in this program
@@ -2001,7 +2454,7 @@ def main() -> None:
         print(str(e), file=sys.stderr)
         sys.exit(0)
     if args.print_version:
-        print("{}, version {}".format(os.path.basename(sys.argv[0]), __version__))
+        print_version()
         sys.exit(0)
     try:
         terminal_menu = TerminalMenu(
@@ -2050,15 +2503,15 @@ def main() -> None:
     if chosen_entries is None:
         sys.exit(0)
     else:
-        if isinstance(chosen_entries, Iterable):
+        if isinstance(chosen_entries, tuple):
             if args.stdout:
-                print(",".join(str(entry + 1) for entry in chosen_entries))
+                print(",".join([str(entry + 1) for entry in chosen_entries]))
             sys.exit(chosen_entries[0] + 1)
         else:
-            chosen_entry = chosen_entries
+            chosen_entry_number = chosen_entries + 1
             if args.stdout:
-                print(chosen_entry + 1)
-            sys.exit(chosen_entry + 1)
+                print(chosen_entry_number)
+            sys.exit(chosen_entry_number)
 
 
 if __name__ == "__main__":
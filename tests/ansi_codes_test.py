@@ -0,0 +1,15 @@
+from simple_term_menu import strip_ansi_codes_except_styling
+
+
+def test_styling_codes_are_kept() -> None:
+    styled_string = "\x1b[1;31mred\x1b[0m \x1b[38:5:208morange\x1b[m"
+    assert strip_ansi_codes_except_styling(styled_string) == styled_string
+
+
+def test_private_sequences_ending_with_m_are_stripped() -> None:
+    assert strip_ansi_codes_except_styling("a\x1b[>4;2mb\x1b[?1mc") == "abc"
+    assert strip_ansi_codes_except_styling("\x1b[?4m\x1b[1mbold\x1b[0m") == "\x1b[1mbold\x1b[0m"
+
+
+def test_other_escape_codes_are_stripped() -> None:
+    assert strip_ansi_codes_except_styling("\x1b[2J\x1b[Hclear\x1b[2K") == "clear"
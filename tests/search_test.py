@@ -0,0 +1,29 @@
+from typing import List, Tuple
+
+from simple_term_menu import TerminalMenu
+
+
+def regex_matches(menu_entries: List[str], search_text: str) -> List[Tuple[int, Tuple[int, int]]]:
+    search = TerminalMenu.Search(menu_entries, search_text=search_text)
+    assert search.search_regex is not None
+    matches = []
+    for i, menu_entry in enumerate(menu_entries):
+        match_obj = search.search_regex.search(menu_entry)
+        if match_obj:
+            matches.append((i, match_obj.span()))
+    return matches
+
+
+def test_final_sigma_search() -> None:
+    menu_entries = ["ΟΔΥΣΣΕΥΣ", "οδυσσεύς", "σ", "ς", "odysseus"]
+    for search_text in ("ς", "σ", "Σ", "ΣΣ", "σς"):
+        search = TerminalMenu.Search(menu_entries, search_text=search_text)
+        assert search.matches == regex_matches(menu_entries, search_text)
+    assert TerminalMenu.Search(menu_entries, search_text="ς").matches[:3] == [(0, (3, 4)), (1, (3, 4)), (2, (0, 1))]
+
+
+def test_ascii_query_on_non_ascii_entries() -> None:
+    menu_entries = ["İstanbul", "istanbul", "ISTANBUL"]
+    for search_text in ("i", "is", "stan"):
+        search = TerminalMenu.Search(menu_entries, search_text=search_text)
+        assert search.matches == regex_matches(menu_entries, search_text)